@@ -0,0 +1,42 @@
+"""
+Shared Supabase client
+Built once at import so every router uses the same HTTP connection pool
+"""
+
+from supabase import ClientOptions, create_client
+import httpx
+import os
+import structlog
+
+# Initialize logger
+logger = structlog.get_logger()
+
+# Supabase configuration
+url = os.getenv("SUPABASE_URL", "")
+key = os.getenv("SUPABASE_KEY", "")
+
+if not url or not key:
+    logger.warning(
+        "supabase_not_configured", message="SUPABASE_URL and SUPABASE_KEY must be set"
+    )
+    supabase_cli = None
+else:
+    try:
+        # One pooled HTTP/2 client so calls reuse warm TLS connections
+        supabase_cli = create_client(
+            url,
+            key,
+            options=ClientOptions(
+                httpx_client=httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(
+                        max_keepalive_connections=100, keepalive_expiry=60
+                    ),
+                    timeout=5.0,
+                )
+            ),
+        )
+        logger.info("supabase_initialized")
+    except Exception as e:
+        logger.error("supabase_init_failed", error=str(e))
+        supabase_cli = None
@@ -3,11 +3,27 @@ FastAPI Backend for Portfolio
 Main application entry point with structured logging and metrics
 """
 
-from fastapi import FastAPI, Request, Response
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from prometheus_client import (
+    REGISTRY,
+    Counter,
+    Histogram,
+    generate_latest,
+    CONTENT_TYPE_LATEST,
+)
+import asyncio
+import logging
+import logging.handlers
 import os
+import queue
+import secrets
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import orjson
 import structlog
 from dotenv import load_dotenv
 
@@ -22,6 +38,17 @@ ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:4321").split(",
 ENABLE_METRICS = os.getenv("ENABLE_METRICS", "true").lower() == "true"
 ENABLE_REQUEST_LOGGING = os.getenv("ENABLE_REQUEST_LOGGING", "true").lower() == "true"
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Bearer token for non-loopback /metrics scrapers (loopback only when unset)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Threads available for blocking Supabase client calls (asyncio.to_thread)
+SUPABASE_THREADPOOL_SIZE = int(os.getenv("SUPABASE_THREADPOOL_SIZE", "100"))
+
+
+def _orjson_dumps(obj, **kwargs) -> str:
+    """Serialize log events with orjson (stdlib logging expects str, not bytes)"""
+    return orjson.dumps(obj, **kwargs).decode()
+
 
 # Configure structured logging
 structlog.configure(
@@ -34,13 +61,30 @@ structlog.configure(
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer(),
+        structlog.processors.JSONRenderer(
+            serializer=_orjson_dumps,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z,
+        ),
     ],
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
     cache_logger_on_first_use=True,
 )
 
+# Request handlers only enqueue log records; a background thread writes stdout
+log_queue: queue.Queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(
+    log_queue, logging.StreamHandler(sys.stdout), respect_handler_level=True
+)
+root_logger = logging.getLogger()
+root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+root_logger.setLevel(LOG_LEVEL)
+log_listener.start()
+
+# Evaluated once: lets hot paths skip building log kwargs when INFO is filtered out
+INFO_ENABLED = root_logger.isEnabledFor(logging.INFO)
+LOG_REQUESTS = ENABLE_REQUEST_LOGGING and INFO_ENABLED
+
 logger = structlog.get_logger()
 
 # Prometheus metrics (cloud-agnostic, works with AWS CloudWatch, AliCloud ARMS, or standalone Prometheus)
@@ -56,13 +100,28 @@ http_request_duration_seconds = Histogram(
     ["method", "endpoint"],
 )
 
+
+@lru_cache(maxsize=2048)
+def _requests_child(method: str, endpoint: str, status: int):
+    """Cached labelled child of http_requests_total"""
+    return http_requests_total.labels(method=method, endpoint=endpoint, status=status)
+
+
+@lru_cache(maxsize=2048)
+def _duration_child(method: str, endpoint: str):
+    """Cached labelled child of http_request_duration_seconds"""
+    return http_request_duration_seconds.labels(method=method, endpoint=endpoint)
+
+
 # Initialize FastAPI
 app = FastAPI(
     title="Portfolio API",
     description="Backend API for ML/AI Engineer Portfolio - Multi-cloud ready",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     docs_url="/api/docs" if ENVIRONMENT == "development" else None,
     redoc_url="/api/redoc" if ENVIRONMENT == "development" else None,
+    openapi_url="/api/openapi.json" if ENVIRONMENT == "development" else None,
 )
 
 # CORS middleware
@@ -81,14 +140,14 @@ async def logging_and_metrics_middleware(request: Request, call_next):
     Middleware for request logging and metrics collection
     Works with any cloud provider or log aggregation service
     """
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     # Extract request info
     path = request.url.path
     method = request.method
 
     # Log request start
-    if ENABLE_REQUEST_LOGGING:
+    if LOG_REQUESTS:
         logger.info(
             "request_started",
             method=method,
@@ -100,20 +159,21 @@ async def logging_and_metrics_middleware(request: Request, call_next):
     response = await call_next(request)
 
     # Calculate duration
-    duration = time.time() - start_time
+    duration = time.perf_counter() - start_time
 
-    # Record metrics
+    # Record metrics, labelled by route template to keep cardinality bounded.
+    # The route is only set once routing ran, so resolve it after call_next;
+    # 404s and other unrouted requests share "__unmatched__" (a high rate of
+    # those usually means scanner traffic).
     if ENABLE_METRICS:
-        http_requests_total.labels(
-            method=method, endpoint=path, status=response.status_code
-        ).inc()
+        route = request.scope.get("route")
+        endpoint = route.path if route else "__unmatched__"
 
-        http_request_duration_seconds.labels(method=method, endpoint=path).observe(
-            duration
-        )
+        _requests_child(method, endpoint, response.status_code).inc()
+        _duration_child(method, endpoint).observe(duration)
 
     # Log request completion
-    if ENABLE_REQUEST_LOGGING:
+    if LOG_REQUESTS:
         logger.info(
             "request_completed",
             method=method,
@@ -158,11 +218,43 @@ async def health_check():
         },
     }
 
-    logger.info("health_check_performed", **health_status)
+    if INFO_ENABLED:
+        logger.info("health_check_performed", **health_status)
     return health_status
 
 
-@app.get("/metrics")
+class _SingleFamily:
+    """Collector wrapper exposing one already-collected metric family"""
+
+    def __init__(self, metric):
+        self._metric = metric
+
+    def collect(self):
+        return [self._metric]
+
+
+def _iter_metrics():
+    """Yield the exposition text one metric family at a time"""
+    for metric in REGISTRY.collect():
+        yield generate_latest(_SingleFamily(metric))
+
+
+def _only_internal(request: Request) -> None:
+    """Allow /metrics from loopback, or from anywhere with the METRICS_TOKEN bearer"""
+    if request.client and request.client.host in {"127.0.0.1", "::1"}:
+        return
+
+    # Compare bytes: compare_digest rejects non-ASCII str with a TypeError
+    authorization = request.headers.get("authorization", "").encode("latin-1")
+    if METRICS_TOKEN and secrets.compare_digest(
+        authorization, f"Bearer {METRICS_TOKEN}".encode()
+    ):
+        return
+
+    raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@app.get("/metrics", dependencies=[Depends(_only_internal)])
 async def metrics():
     """
     Prometheus-compatible metrics endpoint
@@ -171,11 +263,13 @@ async def metrics():
     - AWS CloudWatch Container Insights
     - AliCloud ARMS Prometheus
     - Any Prometheus-compatible scraper
+
+    Streamed per metric family; restricted to loopback or METRICS_TOKEN.
     """
     if not ENABLE_METRICS:
         return Response(content="Metrics disabled", status_code=404)
 
-    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    return StreamingResponse(_iter_metrics(), media_type=CONTENT_TYPE_LATEST)
 
 
 # Include routers
@@ -186,7 +280,11 @@ app.include_router(contact.router)
 # Startup and shutdown events
 @app.on_event("startup")
 async def startup_event():
-    """Log application startup"""
+    """Log application startup and start background tracking writers"""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=SUPABASE_THREADPOOL_SIZE)
+    )
+    stats.start_flushers()
     logger.info(
         "application_startup",
         environment=ENVIRONMENT,
@@ -197,5 +295,7 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Log application shutdown"""
+    """Flush queued tracking rows and logs on application shutdown"""
+    await stats.stop_flushers()
     logger.info("application_shutdown")
+    log_listener.stop()
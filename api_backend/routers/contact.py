@@ -4,38 +4,27 @@ Handles contact form submissions and stores them in Supabase
 """
 
 from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel, EmailStr, Field
-from supabase import create_client
-import os
-from datetime import datetime, timezone
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+import asyncio
 import structlog
 
-router = APIRouter(prefix="/api/contact", tags=["contact"])
+from db import supabase_cli
+
+router = APIRouter(
+    prefix="/api/contact", tags=["contact"], default_response_class=ORJSONResponse
+)
 
 # Initialize logger
 logger = structlog.get_logger()
 
-# Supabase configuration
-url = os.getenv("SUPABASE_URL", "")
-key = os.getenv("SUPABASE_KEY", "")
-
-if not url or not key:
-    logger.warning(
-        "supabase_not_configured", message="SUPABASE_URL and SUPABASE_KEY must be set"
-    )
-    supabase_cli = None
-else:
-    try:
-        supabase_cli = create_client(url, key)
-        logger.info("supabase_initialized", service="contact")
-    except Exception as e:
-        logger.error("supabase_init_failed", error=str(e))
-        supabase_cli = None
-
 
 class ContactMessage(BaseModel):
     """Contact form data model"""
 
+    # Field-level max_length already bounds every string here
+    model_config = ConfigDict(extra="ignore", frozen=True, str_strip_whitespace=True)
+
     name: str = Field(..., min_length=1, max_length=100, description="Sender's name")
     email: EmailStr = Field(..., description="Sender's email address")
     subject: str | None = Field(None, max_length=200, description="Message subject")
@@ -70,12 +59,13 @@ async def submit_contact(contact: ContactMessage, request: Request):
             "email": contact.email,
             "subject": contact.subject or "No subject",
             "message": contact.message,
-            "created_at": datetime.now(timezone.utc).isoformat(),
             "ip_address": client_ip,  # For spam prevention
         }
 
-        # Insert into Supabase
-        result = supabase_cli.table("contact_messages").insert(data).execute()
+        # Insert into Supabase (blocking client call, run off the event loop)
+        result = await asyncio.to_thread(
+            supabase_cli.table("contact_messages").insert(data).execute
+        )
 
         # Log successful submission
         logger.info(
@@ -3,131 +3,472 @@ Analytics and visitor statistics router
 Tracks page visits, user behavior, and generates analytics summaries
 """
 
-from fastapi import APIRouter, HTTPException, Request, Query
-from pydantic import BaseModel, Field
-from supabase import create_client
+from fastapi import APIRouter, HTTPException, Request, Response, Query
+from fastapi.responses import ORJSONResponse
+from postgrest import APIError
+from prometheus_client import Counter
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from user_agents import parse as parse_user_agent
+import asyncio
 import os
+import re
 import hashlib
+import time
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit, urlunsplit
+import orjson
 import structlog
 
-router = APIRouter(prefix="/api/stats", tags=["stats"])
+from db import supabase_cli
+
+router = APIRouter(
+    prefix="/api/stats", tags=["stats"], default_response_class=ORJSONResponse
+)
 
 # Initialize logger
 logger = structlog.get_logger()
 
-# Supabase configuration
-url = os.getenv("SUPABASE_URL", "")
-key = os.getenv("SUPABASE_KEY", "")
 
-if not url or not key:
-    logger.warning(
-        "supabase_not_configured", message="SUPABASE_URL and SUPABASE_KEY must be set"
+# Summary cache: callers tolerate short staleness, so reuse recent aggregates
+STATS_SUMMARY_TTL_SECONDS = int(os.getenv("STATS_SUMMARY_TTL_SECONDS", "30"))
+_summary_cache: dict[int, tuple[float, dict]] = {}
+# In-flight summary computations per `days`, shared by concurrent misses
+_summary_inflight: dict[int, asyncio.Task] = {}
+
+# Write batching: handlers enqueue rows, background flushers insert them in bulk
+TRACK_QUEUE_MAXSIZE = int(os.getenv("TRACK_QUEUE_MAXSIZE", "10000"))
+TRACK_BATCH_SIZE = int(os.getenv("TRACK_BATCH_SIZE", "500"))
+TRACK_FLUSH_INTERVAL_SECONDS = float(os.getenv("TRACK_FLUSH_INTERVAL_SECONDS", "0.25"))
+
+visit_queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=TRACK_QUEUE_MAXSIZE)
+event_queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=TRACK_QUEUE_MAXSIZE)
+_flusher_tasks: list[asyncio.Task] = []
+
+visits_dropped_total = Counter(
+    "portfolio_visits_dropped_total",
+    "Tracking rows dropped because the write queue was full",
+    ["table"],
+)
+
+tracking_rows_failed_total = Counter(
+    "portfolio_tracking_rows_failed_total",
+    "Tracking rows lost because their insert failed",
+    ["table"],
+)
+
+
+# Site pages that may be tracked (matched against the normalized path). The
+# site is a static build, so the list is generated from its content by
+# scripts/generate_allowed_pages.py
+ALLOWED_PAGES_FILE = os.getenv(
+    "ALLOWED_PAGES_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "allowed_pages.json"),
+)
+try:
+    with open(ALLOWED_PAGES_FILE, "rb") as f:
+        ALLOWED_PAGES: frozenset[str] = frozenset(orjson.loads(f.read()))
+except (OSError, orjson.JSONDecodeError) as e:
+    logger.error("allowed_pages_load_failed", path=ALLOWED_PAGES_FILE, error=str(e))
+    ALLOWED_PAGES = frozenset()
+
+
+def normalize_url(value: str) -> str:
+    """Canonicalize a URL or path: lowercase host, drop query/fragment and trailing /"""
+    parts = urlsplit(value.strip())
+    return urlunsplit(
+        (parts.scheme, parts.netloc.lower(), parts.path.rstrip("/") or "/", "", "")
     )
-    supabase_cli = None
-else:
-    try:
-        supabase_cli = create_client(url, key)
-        logger.info("supabase_initialized", service="stats")
-    except Exception as e:
-        logger.error("supabase_init_failed", error=str(e))
-        supabase_cli = None
 
 
 class VisitData(BaseModel):
     """Visit tracking data model"""
 
+    model_config = ConfigDict(
+        extra="ignore", frozen=True, str_strip_whitespace=True, str_max_length=2048
+    )
+
     page_url: str = Field(..., description="Current page URL")
     page_title: Optional[str] = Field(None, description="Page title")
     referrer: Optional[str] = Field(None, description="Referrer URL")
     session_id: str = Field(..., description="Client session ID")
-    screen_width: Optional[int] = Field(None, description="Screen width in pixels")
-    screen_height: Optional[int] = Field(None, description="Screen height in pixels")
+    screen_width: Optional[int] = Field(
+        None, ge=0, description="Screen width in pixels"
+    )
+    screen_height: Optional[int] = Field(
+        None, ge=0, description="Screen height in pixels"
+    )
     time_on_page: Optional[int] = Field(
-        None, description="Time spent on page (seconds)"
+        None, ge=0, description="Time spent on page (seconds)"
     )
+    # Mirrors the visits.scroll_depth CHECK so bad rows fail here, not in a batch
     scroll_depth: Optional[int] = Field(
-        None, description="Max scroll depth (percentage)"
+        None, ge=0, le=100, description="Max scroll depth (percentage)"
     )
 
+    @field_validator("page_url")
+    @classmethod
+    def _normalize_page_url(cls, v: str) -> str:
+        """Canonicalize page_url to one of the site's ALLOWED_PAGES"""
+        if not v:
+            raise ValueError("page_url must not be empty")
+
+        parts = urlsplit(v)
+        # The frontend sends window.location.pathname; reject absolute URLs so
+        # clients can't vary the stored scheme/host
+        if parts.scheme or parts.netloc:
+            raise ValueError("page_url must be a site path, not an absolute URL")
+
+        path = parts.path.rstrip("/") or "/"
+        if path not in ALLOWED_PAGES:
+            raise ValueError("page_url is not a tracked page")
+        return path
+
+    @field_validator("referrer")
+    @classmethod
+    def _normalize_referrer(cls, v: Optional[str]) -> Optional[str]:
+        """Canonicalize referrer; empty values count as direct traffic"""
+        return normalize_url(v) if v else None
+
 
 class EventData(BaseModel):
     """Event tracking data model"""
 
+    model_config = ConfigDict(
+        extra="ignore", frozen=True, str_strip_whitespace=True, str_max_length=2048
+    )
+
     session_id: str = Field(..., description="Client session ID")
     event_type: str = Field(..., description="Event type (click, download, etc.)")
     event_data: dict = Field(default_factory=dict, description="Additional event data")
     page_url: str = Field(..., description="Page where event occurred")
 
 
+@lru_cache(maxsize=8192)
 def hash_ip(ip: str) -> str:
-    """Hash IP address for privacy"""
-    return hashlib.sha256(ip.encode()).hexdigest()[:16]
+    """
+    Hash IP address for privacy
+
+    Hex-encodes only the 8 digest bytes we keep; returning visitors are
+    served from the cache.
+    """
+    return hashlib.sha256(ip.encode()).digest()[:8].hex()
+
+
+# Crawler signatures checked before full user agent parsing
+BOT_USER_AGENT_RE = re.compile(
+    r"bot|crawl|spider|slurp|preview|ahrefs|semrush|mj12", re.IGNORECASE
+)
+
 
+class DeviceInfo(NamedTuple):
+    """Parsed device information (immutable so results can be cached)"""
 
-def extract_device_info(user_agent_string: str) -> dict:
+    browser: str
+    browser_version: str
+    os: str
+    os_version: str
+    device_type: str
+    is_bot: bool
+
+
+@lru_cache(maxsize=4096)
+def extract_device_info(user_agent_string: str) -> DeviceInfo:
     """
     Parse user agent string to extract device information
 
-    Returns dict with browser, OS, and device type information
+    Returns browser, OS, and device type information. User agents repeat
+    heavily across visitors, so parsed results are memoized.
     """
     ua = parse_user_agent(user_agent_string)
 
-    return {
-        "browser": ua.browser.family,
-        "browser_version": ua.browser.version_string,
-        "os": ua.os.family,
-        "os_version": ua.os.version_string,
-        "device_type": (
+    return DeviceInfo(
+        browser=ua.browser.family,
+        browser_version=ua.browser.version_string,
+        os=ua.os.family,
+        os_version=ua.os.version_string,
+        device_type=(
             "mobile"
             if ua.is_mobile
             else "tablet" if ua.is_tablet else "bot" if ua.is_bot else "desktop"
         ),
-        "is_bot": ua.is_bot,
-    }
+        is_bot=ua.is_bot,
+    )
+
+
+# Raw ASGI header names (lowercase bytes), in lookup priority order
+IP_HEADERS = (b"x-forwarded-for", b"x-real-ip")
+COUNTRY_HEADERS = (b"cloudfront-viewer-country", b"x-country-code", b"cf-ipcountry")
+CITY_HEADERS = (b"cloudfront-viewer-city", b"x-city")
+_WANTED_HEADERS = frozenset(IP_HEADERS + COUNTRY_HEADERS + CITY_HEADERS)
+
+
+def _scan_headers(request: Request) -> dict[bytes, bytes]:
+    """Collect the first value of each wanted header in one pass over the raw list"""
+    found = {}
+    for name, value in request.scope["headers"]:
+        if name in _WANTED_HEADERS and name not in found:
+            found[name] = value
+    return found
+
+
+def _first_header(found: dict[bytes, bytes], names: tuple[bytes, ...]) -> Optional[str]:
+    """Return the first non-empty header among `names`, decoded like Starlette does"""
+    for name in names:
+        value = found.get(name)
+        if value:
+            return value.decode("latin-1")
+    return None
 
 
-def get_client_ip(request: Request) -> str:
-    """Extract real client IP from request headers"""
+def get_client_ip(request: Request, found: Optional[dict[bytes, bytes]] = None) -> str:
+    """
+    Extract real client IP from request headers
+
+    Pass `found` from _scan_headers to reuse an existing header scan.
+    """
+    if found is None:
+        found = _scan_headers(request)
+
     # Check common proxy headers (CloudFront, ALB, Nginx, etc.)
-    forwarded_for = request.headers.get("x-forwarded-for")
+    forwarded_for = found.get(b"x-forwarded-for")
     if forwarded_for:
         # X-Forwarded-For can be a comma-separated list, take the first one
-        return forwarded_for.split(",")[0].strip()
+        return forwarded_for.decode("latin-1").split(",")[0].strip()
 
-    real_ip = request.headers.get("x-real-ip")
+    real_ip = found.get(b"x-real-ip")
     if real_ip:
-        return real_ip
+        return real_ip.decode("latin-1")
 
     return request.client.host if request.client else "unknown"
 
 
-def get_location_from_headers(request: Request) -> dict:
+def get_location_from_headers(
+    request: Request, found: Optional[dict[bytes, bytes]] = None
+) -> dict:
     """
     Extract location from CloudFront/CDN headers
 
     CloudFront adds: CloudFront-Viewer-Country, CloudFront-Viewer-City, etc.
     AliCloud CDN adds: Ali-CDN-Real-IP, similar location headers
+    Pass `found` from _scan_headers to reuse an existing header scan.
     """
+    if found is None:
+        found = _scan_headers(request)
     return {
-        "country": request.headers.get("cloudfront-viewer-country")
-        or request.headers.get("x-country-code")
-        or request.headers.get("cf-ipcountry")
-        or None,
-        "city": request.headers.get("cloudfront-viewer-city")
-        or request.headers.get("x-city")
-        or None,
+        "country": _first_header(found, COUNTRY_HEADERS),
+        "city": _first_header(found, CITY_HEADERS),
     }
 
 
+def _prepare_visit_rows(batch: list[dict]) -> list[dict]:
+    """
+    Turn queued visits into visits rows
+
+    User agent parsing and IP hashing happen here, in the flusher thread,
+    rather than in the request handler. Bots the fast-path regex missed
+    are dropped.
+    """
+    rows = []
+    for data in batch:
+        try:
+            device_info = extract_device_info(data["user_agent"])
+            if device_info.is_bot:
+                logger.info(
+                    "bot_visit_skipped",
+                    bot_type=device_info.browser,
+                    page=data["page_url"],
+                )
+                continue
+
+            row = {**data, **device_info._asdict()}
+            del row["is_bot"]  # parse flag, not a visits column
+            row["ip_hash"] = hash_ip(row.pop("client_ip"))
+        except Exception as e:
+            # One unparseable visit must not take the rest of the batch with it
+            tracking_rows_failed_total.labels(table="visits").inc()
+            logger.error(
+                "visit_prepare_error",
+                error=str(e),
+                error_type=type(e).__name__,
+                page=data.get("page_url"),
+                session=str(data.get("session_id", ""))[:8],
+            )
+            continue
+
+        rows.append(row)
+    return rows
+
+
+# SQLSTATE classes caused by the row values themselves: 22 data exception
+# (bad value/type), 23 integrity constraint violation (CHECK, NOT NULL, ...)
+ROW_DATA_SQLSTATE_CLASSES = ("22", "23")
+
+
+def _is_row_data_error(error: APIError) -> bool:
+    """Whether a PostgREST error was caused by row values (worth bisecting)"""
+    return isinstance(error.code, str) and error.code[:2] in ROW_DATA_SQLSTATE_CLASSES
+
+
+def _insert_rows(table: str, rows: list[dict]) -> int:
+    """
+    Insert rows in one Supabase request, returning how many were lost
+
+    PostgREST rejects the whole request if any row violates a constraint,
+    so on a row-data error the batch is bisected until the bad rows are
+    isolated and the good ones go through. Other API errors (permissions,
+    schema, auth) and transport errors aren't row-specific, so they are
+    raised and fail the whole batch without retrying.
+    """
+    try:
+        supabase_cli.table(table).insert(rows).execute()
+        return 0
+    except APIError as e:
+        if not _is_row_data_error(e):
+            raise
+        if len(rows) == 1:
+            logger.error(
+                "row_insert_error",
+                table=table,
+                error=e.message,
+                code=e.code,
+                session=str(rows[0].get("session_id", ""))[:8],
+            )
+            return 1
+
+        mid = len(rows) // 2
+        return _insert_rows(table, rows[:mid]) + _insert_rows(table, rows[mid:])
+
+
+def _write_batch(table: str, batch: list[dict], prepare) -> tuple[int, int]:
+    """Prepare and insert a batch (blocking); returns (inserted, failed) counts"""
+    rows = prepare(batch) if prepare else batch
+    if not rows:
+        return 0, 0
+
+    failed = _insert_rows(table, rows)
+    return len(rows) - failed, failed
+
+
+async def _insert_batch(table: str, batch: list[dict], prepare=None) -> None:
+    """Write a batch off the event loop, logging and counting (not raising) errors"""
+    try:
+        inserted, failed = await asyncio.to_thread(_write_batch, table, batch, prepare)
+    except Exception as e:
+        tracking_rows_failed_total.labels(table=table).inc(len(batch))
+        logger.error(
+            "batch_insert_error",
+            table=table,
+            rows=len(batch),
+            error=str(e),
+            error_type=type(e).__name__,
+        )
+        return
+
+    if failed:
+        tracking_rows_failed_total.labels(table=table).inc(failed)
+    logger.info("batch_inserted", table=table, rows=inserted, failed=failed)
+
+
+async def flusher(queue: asyncio.Queue, table: str, prepare=None) -> None:
+    """
+    Drain `queue` into `table` in batches
+
+    Waits for the first row, then collects more until TRACK_BATCH_SIZE rows
+    or TRACK_FLUSH_INTERVAL_SECONDS have elapsed, whichever comes first.
+    `prepare`, if given, converts queued items into table rows.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + TRACK_FLUSH_INTERVAL_SECONDS
+
+        try:
+            while len(batch) < TRACK_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # Shutting down mid-batch: don't lose rows already taken off the queue
+            await _insert_batch(table, batch, prepare)
+            raise
+
+        await _insert_batch(table, batch, prepare)
+
+
+# (queue, table, prepare) for each background writer
+_FLUSH_TARGETS = (
+    (visit_queue, "visits", _prepare_visit_rows),
+    (event_queue, "events", None),
+)
+
+
+def start_flushers() -> None:
+    """Launch background flushers for the visit and event queues"""
+    if not supabase_cli or _flusher_tasks:
+        return
+
+    for queue, table, prepare in _FLUSH_TARGETS:
+        _flusher_tasks.append(asyncio.create_task(flusher(queue, table, prepare)))
+    logger.info("flushers_started", batch_size=TRACK_BATCH_SIZE)
+
+
+async def stop_flushers() -> None:
+    """Cancel the flushers and write out any rows still queued"""
+    for task in _flusher_tasks:
+        task.cancel()
+    await asyncio.gather(*_flusher_tasks, return_exceptions=True)
+    _flusher_tasks.clear()
+
+    for queue, table, prepare in _FLUSH_TARGETS:
+        batch = []
+        while not queue.empty():
+            batch.append(queue.get_nowait())
+        if batch:
+            await _insert_batch(table, batch, prepare)
+
+
+def _queue_engagement(visit: VisitData) -> dict:
+    """Queue a /track engagement ping as a page_engagement events row"""
+    data = {
+        "session_id": visit.session_id,
+        "event_type": "page_engagement",
+        "event_data": {
+            "time_on_page": visit.time_on_page,
+            "scroll_depth": visit.scroll_depth,
+        },
+        "page_url": visit.page_url,
+    }
+    try:
+        event_queue.put_nowait(data)
+    except asyncio.QueueFull:
+        visits_dropped_total.labels(table="events").inc()
+        logger.warning(
+            "event_dropped", reason="queue_full", event_type="page_engagement"
+        )
+        return {"message": "Engagement tracking failed", "tracked": False}
+
+    logger.info(
+        "engagement_tracked",
+        page=visit.page_url,
+        session=visit.session_id[:8],
+    )
+    return {"message": "Engagement tracked successfully", "tracked": True}
+
+
 @router.post("/track")
 async def track_visit(visit: VisitData, request: Request):
     """
     Track a page visit with detailed analytics
 
-    Captures device info, location, and user behavior metrics.
+    Captures device info, location, and user behavior metrics. Device info
+    is parsed by the background flusher, so only fast-path bots are
+    reported back as untracked.
     """
     if not supabase_cli:
         logger.error("visit_tracking_failed", reason="supabase_not_configured")
@@ -136,59 +477,51 @@ async def track_visit(visit: VisitData, request: Request):
         )
 
     try:
-        # Extract client information
-        # TODO: Use it in future
-        # client_ip = get_client_ip(request)
         user_agent = request.headers.get("user-agent", "unknown")
 
-        # Parse device information
-        device_info = extract_device_info(user_agent)
-
-        # Get location from headers (CDN-provided)
-        location = get_location_from_headers(request)
-
-        # Skip bot traffic (optional - comment out if you want to track bots)
-        if device_info["is_bot"]:
-            logger.info(
-                "bot_visit_skipped",
-                bot_type=device_info["browser"],
-                page=visit.page_url,
-            )
+        # Skip obvious bots before any parsing work
+        if (
+            BOT_USER_AGENT_RE.search(user_agent)
+            or "from" in request.headers
+            or "x-bot" in request.headers
+        ):
+            logger.info("bot_visit_skipped", bot_type="fast_path", page=visit.page_url)
             return {"message": "Bot visit logged", "tracked": False}
 
-        # TODO: Use it in future
-
-        # Prepare data for database
-        # data = {
-        #     "session_id": visit.session_id,
-        #     "ip_hash": hash_ip(client_ip),
-        #     "country": location.get("country"),
-        #     "city": location.get("city"),
-        #     "user_agent": user_agent,
-        #     "device_type": device_info["device_type"],
-        #     "browser": device_info["browser"],
-        #     "browser_version": device_info["browser_version"],
-        #     "os": device_info["os"],
-        #     "os_version": device_info["os_version"],
-        #     "screen_width": visit.screen_width,
-        #     "screen_height": visit.screen_height,
-        #     "page_url": visit.page_url,
-        #     "page_title": visit.page_title,
-        #     "referrer": visit.referrer,
-        #     "time_on_page": visit.time_on_page,
-        #     "scroll_depth": visit.scroll_depth,
-        #     "created_at": datetime.now(timezone.utc).isoformat(),
-        # }
-
-        # Insert into Supabase
-        # result = supabase_cli.table("visits").insert(data).execute()
+        # Engagement pings (sent on page hide/unload) describe a visit that
+        # was already tracked; record them as events so they don't count as
+        # extra visits. Clients built before /event was used still send here.
+        if visit.time_on_page is not None or visit.scroll_depth is not None:
+            return _queue_engagement(visit)
+
+        # One pass over the raw headers serves both IP and location lookups
+        found = _scan_headers(request)
+
+        # Extract client information
+        client_ip = get_client_ip(request, found)
+
+        # Get location from headers (CDN-provided)
+        location = get_location_from_headers(request, found)
+
+        # Prepare data for database (model fields match visits columns);
+        # UA parsing and IP hashing are deferred to the visits flusher
+        data = visit.model_dump()
+        data.update(location)
+        data["user_agent"] = user_agent
+        data["client_ip"] = client_ip
+
+        # Queue for batched insert into Supabase
+        try:
+            visit_queue.put_nowait(data)
+        except asyncio.QueueFull:
+            visits_dropped_total.labels(table="visits").inc()
+            logger.warning("visit_dropped", reason="queue_full", page=visit.page_url)
+            return {"message": "Visit tracking failed", "tracked": False}
 
         # Log successful tracking
         logger.info(
             "visit_tracked",
             page=visit.page_url,
-            device=device_info["device_type"],
-            browser=device_info["browser"],
             country=location.get("country"),
             session=visit.session_id[:8],  # Log partial session ID
         )
@@ -218,16 +551,18 @@ async def track_event(event: EventData, request: Request):
         )
 
     try:
-        # TODO: Use it in future
-
-        # data = {
-        #     "session_id": event.session_id,
-        #     "event_type": event.event_type,
-        #     "event_data": event.event_data,
-        #     "page_url": event.page_url,
-        #     "created_at": datetime.now(timezone.utc).isoformat(),
-        # }
-        # result = supabase_cli.table("events").insert(data).execute()
+        # Model fields match events columns
+        data = event.model_dump()
+
+        # Queue for batched insert into Supabase
+        try:
+            event_queue.put_nowait(data)
+        except asyncio.QueueFull:
+            visits_dropped_total.labels(table="events").inc()
+            logger.warning(
+                "event_dropped", reason="queue_full", event_type=event.event_type
+            )
+            return {"message": "Event tracking failed", "tracked": False}
 
         logger.info(
             "event_tracked",
@@ -243,16 +578,77 @@ async def track_event(event: EventData, request: Request):
         return {"message": "Event tracking failed", "tracked": False}
 
 
+async def _compute_summary(days: int) -> dict:
+    """Run the stats_summary RPC for `days` and cache the payload for the TTL"""
+    # Calculate date range
+    end_date = datetime.now(timezone.utc)
+    start_date = end_date - timedelta(days=days)
+
+    # Aggregate in the database (see stats_summary migration)
+    # Run the blocking client call off the event loop
+    result = await asyncio.to_thread(
+        supabase_cli.rpc("stats_summary", {"days": days}).execute
+    )
+    summary = result.data or {}
+
+    logger.info(
+        "summary_generated", days=days, total_visits=summary.get("total_visits", 0)
+    )
+
+    payload = {
+        "period_days": days,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "total_visits": summary.get("total_visits", 0),
+        "unique_visitors": summary.get("unique_visitors", 0),
+        "devices": summary.get("devices", {}),
+        "top_pages": summary.get("top_pages", []),
+        "top_referrers": summary.get("top_referrers", []),
+    }
+    _summary_cache[days] = (time.monotonic() + STATS_SUMMARY_TTL_SECONDS, payload)
+    return payload
+
+
+def _summary_done(days: int, task: asyncio.Task) -> None:
+    """Forget a finished computation; mark its error retrieved if nobody awaited"""
+    _summary_inflight.pop(days, None)
+    if not task.cancelled():
+        task.exception()
+
+
+async def _summary(days: int) -> dict:
+    """
+    Build the analytics summary payload, cached per `days` for the TTL
+
+    Concurrent misses for the same `days` await one in-flight computation
+    and share its result or error; other `days` values are never blocked.
+    """
+    cached = _summary_cache.get(days)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    task = _summary_inflight.get(days)
+    if task is None:
+        task = asyncio.create_task(_compute_summary(days))
+        task.add_done_callback(lambda t: _summary_done(days, t))
+        _summary_inflight[days] = task
+
+    # Shield so one disconnecting client doesn't cancel it for the others
+    return await asyncio.shield(task)
+
+
 @router.get("/summary")
 async def get_summary(
+    response: Response,
     days: int = Query(
         default=30, ge=1, le=365, description="Number of days to include in summary"
-    )
+    ),
 ):
     """
     Get analytics summary
 
     Returns aggregated statistics for the specified time period.
+    Results are cached in-process for STATS_SUMMARY_TTL_SECONDS.
     """
     if not supabase_cli:
         raise HTTPException(
@@ -260,89 +656,7 @@ async def get_summary(
         )
 
     try:
-        # Calculate date range
-        end_date = datetime.now(timezone.utc)
-        start_date = end_date - timedelta(days=days)
-
-        # Get visit count
-        visits_result = (
-            supabase_cli.table("visits")
-            .select("*", count="exact")
-            .gte("created_at", start_date.isoformat())
-            .execute()
-        )
-
-        # Get unique sessions
-        sessions_result = (
-            supabase_cli.table("visits")
-            .select("session_id")
-            .gte("created_at", start_date.isoformat())
-            .execute()
-        )
-
-        unique_sessions = len(
-            set(v["session_id"] for v in sessions_result.data if "session_id" in v)
-        )
-
-        # Get device breakdown
-        device_result = (
-            supabase_cli.table("visits")
-            .select("device_type")
-            .gte("created_at", start_date.isoformat())
-            .execute()
-        )
-
-        device_counts = {}
-        for visit in device_result.data:
-            device_type = visit.get("device_type", "unknown")
-            device_counts[device_type] = device_counts.get(device_type, 0) + 1
-
-        # Get top pages
-        pages_result = (
-            supabase_cli.table("visits")
-            .select("page_url")
-            .gte("created_at", start_date.isoformat())
-            .execute()
-        )
-
-        page_counts = {}
-        for visit in pages_result.data:
-            page_url = visit.get("page_url", "unknown")
-            page_counts[page_url] = page_counts.get(page_url, 0) + 1
-
-        top_pages = sorted(page_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-
-        # Get referrer breakdown
-        referrer_result = (
-            supabase_cli.table("visits")
-            .select("referrer")
-            .gte("created_at", start_date.isoformat())
-            .execute()
-        )
-
-        referrer_counts = {}
-        for visit in referrer_result.data:
-            referrer = visit.get("referrer") or "direct"
-            referrer_counts[referrer] = referrer_counts.get(referrer, 0) + 1
-
-        top_referrers = sorted(
-            referrer_counts.items(), key=lambda x: x[1], reverse=True
-        )[:10]
-
-        logger.info("summary_generated", days=days, total_visits=visits_result.count)
-
-        return {
-            "period_days": days,
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat(),
-            "total_visits": visits_result.count,
-            "unique_visitors": unique_sessions,
-            "devices": device_counts,
-            "top_pages": [{"url": url, "visits": count} for url, count in top_pages],
-            "top_referrers": [
-                {"source": ref, "visits": count} for ref, count in top_referrers
-            ],
-        }
+        payload = await _summary(days)
 
     except Exception as e:
         logger.error("summary_generation_error", error=str(e))
@@ -350,6 +664,10 @@ async def get_summary(
             status_code=500, detail=f"Failed to generate summary: {str(e)}"
         )
 
+    # Let the CDN/browser share the same staleness window
+    response.headers["Cache-Control"] = f"public, max-age={STATS_SUMMARY_TTL_SECONDS}"
+    return payload
+
 
 @router.get("/health")
 async def stats_health():
@@ -0,0 +1,66 @@
+"""
+Generate allowed_pages.json: the site paths /api/stats/track accepts
+
+The frontend is a static Astro build, so every page is known ahead of time:
+the section pages plus one page per non-draft entry in the content
+collections. Re-run after adding or removing content:
+
+    python scripts/generate_allowed_pages.py
+"""
+
+from pathlib import Path
+import json
+import math
+import re
+
+ROOT = Path(__file__).resolve().parents[2]
+CONTENT_DIR = ROOT / "astro_frontend" / "src" / "content"
+OUTPUT = Path(__file__).resolve().parents[1] / "allowed_pages.json"
+
+# Pages with no content collection behind them (src/pages/*.astro)
+SECTION_PAGES = ["/", "/agents", "/blog", "/ml", "/others", "/photography"]
+
+# Collection -> (route prefix, frontmatter draft flag), as in src/pages/*/[slug]
+COLLECTIONS = {
+    "blog": ("/blog", "isDraft"),
+    "ml": ("/ml", "draft"),
+    "agents": ("/agents", "draft"),
+    "albums": ("/photography", "draft"),
+}
+
+# pageSize passed to paginate() in src/pages/blog/[...page].astro
+BLOG_PAGE_SIZE = 6
+
+FRONTMATTER_RE = re.compile(r"\A---\s*\n(.*?)\n---", re.DOTALL)
+
+
+def is_draft(path: Path, flag: str) -> bool:
+    """Whether a content entry's frontmatter sets its draft flag to true"""
+    match = FRONTMATTER_RE.match(path.read_text(encoding="utf-8"))
+    if not match:
+        return False
+    draft_re = re.compile(rf"^{flag}:\s*true\s*$", re.MULTILINE | re.IGNORECASE)
+    return bool(draft_re.search(match.group(1)))
+
+
+def collect_pages() -> list[str]:
+    pages = set(SECTION_PAGES)
+    for collection, (prefix, flag) in COLLECTIONS.items():
+        entries = [
+            p
+            for p in sorted((CONTENT_DIR / collection).glob("*.md*"))
+            if not is_draft(p, flag)
+        ]
+        pages.update(f"{prefix}/{p.stem.lower()}" for p in entries)
+
+        if collection == "blog":
+            # /blog is page 1; paginate() serves the rest as /blog/2, /blog/3, ...
+            page_count = math.ceil(len(entries) / BLOG_PAGE_SIZE)
+            pages.update(f"/blog/{n}" for n in range(2, page_count + 1))
+    return sorted(pages)
+
+
+if __name__ == "__main__":
+    pages = collect_pages()
+    OUTPUT.write_text(json.dumps(pages, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote {len(pages)} pages to {OUTPUT}")
@@ -0,0 +1,70 @@
+-- Stats summary aggregation function
+-- Created: 2025-11-02
+-- Description: Computes the /api/stats/summary payload in the database so the
+--              API issues a single RPC instead of scanning visits four times
+
+-- ============================================================================
+-- STATS_SUMMARY FUNCTION
+-- Called via PostgREST: supabase_cli.rpc("stats_summary", {"days": 30})
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION stats_summary(days INT)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+    WITH recent AS (
+        SELECT session_id, device_type, page_url, referrer
+        FROM visits
+        WHERE created_at >= NOW() - make_interval(days => stats_summary.days)
+    )
+    SELECT json_build_object(
+        'total_visits', (SELECT COUNT(*) FROM recent),
+        'unique_visitors', (SELECT COUNT(DISTINCT session_id) FROM recent),
+        'devices', COALESCE(
+            (
+                SELECT json_object_agg(device_type, visits)
+                FROM (
+                    SELECT COALESCE(device_type, 'unknown') AS device_type,
+                           COUNT(*) AS visits
+                    FROM recent
+                    GROUP BY 1
+                ) d
+            ),
+            '{}'::json
+        ),
+        'top_pages', COALESCE(
+            (
+                SELECT json_agg(
+                    json_build_object('url', url, 'visits', visits)
+                    ORDER BY visits DESC
+                )
+                FROM (
+                    SELECT page_url AS url, COUNT(*) AS visits
+                    FROM recent
+                    GROUP BY 1
+                    ORDER BY 2 DESC
+                    LIMIT 10
+                ) p
+            ),
+            '[]'::json
+        ),
+        'top_referrers', COALESCE(
+            (
+                SELECT json_agg(
+                    json_build_object('source', source, 'visits', visits)
+                    ORDER BY visits DESC
+                )
+                FROM (
+                    SELECT COALESCE(NULLIF(referrer, ''), 'direct') AS source,
+                           COUNT(*) AS visits
+                    FROM recent
+                    GROUP BY 1
+                    ORDER BY 2 DESC
+                    LIMIT 10
+                ) r
+            ),
+            '[]'::json
+        )
+    );
+$$;
@@ -0,0 +1,21 @@
+-- Database-assigned timestamps
+-- Created: 2025-11-02
+-- Description: The API no longer sends created_at; rows rely on the column
+--              default, so make it mandatory on every tracked table
+
+-- Backfill any rows written without a timestamp before tightening the column
+UPDATE visits SET created_at = NOW() WHERE created_at IS NULL;
+UPDATE events SET created_at = NOW() WHERE created_at IS NULL;
+UPDATE contact_messages SET created_at = NOW() WHERE created_at IS NULL;
+
+ALTER TABLE visits
+    ALTER COLUMN created_at SET DEFAULT NOW(),
+    ALTER COLUMN created_at SET NOT NULL;
+
+ALTER TABLE events
+    ALTER COLUMN created_at SET DEFAULT NOW(),
+    ALTER COLUMN created_at SET NOT NULL;
+
+ALTER TABLE contact_messages
+    ALTER COLUMN created_at SET DEFAULT NOW(),
+    ALTER COLUMN created_at SET NOT NULL;
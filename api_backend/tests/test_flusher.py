@@ -0,0 +1,180 @@
+"""
+Tests for the batched tracking writers in routers.stats
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from postgrest import APIError
+from prometheus_client import REGISTRY
+from pydantic import ValidationError
+
+from routers import stats
+
+
+class FakeQuery:
+    """Records inserts; rejects rows breaking the visits.scroll_depth CHECK"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.rows = []
+
+    def insert(self, rows):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        self.client.calls += 1
+        if self.client.api_error_code:
+            raise APIError({"message": "denied", "code": self.client.api_error_code})
+        if self.client.transport_error:
+            raise httpx.ConnectError("connection refused")
+        if any((row.get("scroll_depth") or 0) > 100 for row in self.rows):
+            raise APIError({"message": "violates check constraint", "code": "23514"})
+        self.client.inserted.setdefault(self.table, []).extend(self.rows)
+        return self
+
+
+class FakeSupabase:
+    def __init__(self, transport_error=False, api_error_code=None):
+        self.inserted = {}
+        self.transport_error = transport_error
+        self.api_error_code = api_error_code
+        self.calls = 0
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+@pytest.fixture
+def fake_supabase(monkeypatch):
+    client = FakeSupabase()
+    monkeypatch.setattr(stats, "supabase_cli", client)
+    return client
+
+
+def failed_rows(table):
+    return (
+        REGISTRY.get_sample_value(
+            "portfolio_tracking_rows_failed_total", {"table": table}
+        )
+        or 0
+    )
+
+
+def test_flusher_inserts_queued_rows_in_one_batch(fake_supabase):
+    async def run():
+        queue = asyncio.Queue()
+        for i in range(3):
+            queue.put_nowait({"session_id": f"s{i}"})
+        task = asyncio.create_task(stats.flusher(queue, "batched"))
+        await asyncio.sleep(stats.TRACK_FLUSH_INTERVAL_SECONDS + 0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+    assert [r["session_id"] for r in fake_supabase.inserted["batched"]] == [
+        "s0",
+        "s1",
+        "s2",
+    ]
+
+
+def test_bad_row_is_isolated_and_counted(fake_supabase):
+    batch = [{"session_id": "a"}, {"session_id": "b", "scroll_depth": 150}]
+    batch.append({"session_id": "c", "scroll_depth": 40})
+    before = failed_rows("bisect")
+
+    asyncio.run(stats._insert_batch("bisect", batch))
+
+    assert [r["session_id"] for r in fake_supabase.inserted["bisect"]] == ["a", "c"]
+    assert failed_rows("bisect") == before + 1
+
+
+def test_transport_error_counts_whole_batch(monkeypatch):
+    client = FakeSupabase(transport_error=True)
+    monkeypatch.setattr(stats, "supabase_cli", client)
+    before = failed_rows("offline")
+
+    asyncio.run(stats._insert_batch("offline", [{"session_id": "a"}] * 4))
+
+    assert client.inserted == {}
+    assert failed_rows("offline") == before + 4
+
+
+@pytest.mark.parametrize("code", ["42501", "PGRST204", "PGRST301"])
+def test_non_row_api_error_fails_batch_without_bisecting(monkeypatch, code):
+    client = FakeSupabase(api_error_code=code)
+    monkeypatch.setattr(stats, "supabase_cli", client)
+    table = f"denied-{code}"
+    before = failed_rows(table)
+
+    asyncio.run(stats._insert_batch(table, [{"session_id": "a"}] * 500))
+
+    assert client.calls == 1
+    assert failed_rows(table) == before + 500
+
+
+def test_cancel_mid_batch_writes_collected_rows(fake_supabase, monkeypatch):
+    monkeypatch.setattr(stats, "TRACK_FLUSH_INTERVAL_SECONDS", 30)
+
+    async def run():
+        queue = asyncio.Queue()
+        task = asyncio.create_task(stats.flusher(queue, "cancelled"))
+        queue.put_nowait({"session_id": "a"})
+        await asyncio.sleep(0.05)  # flusher is now waiting for more rows
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+    assert fake_supabase.inserted["cancelled"] == [{"session_id": "a"}]
+
+
+def test_stop_flushers_drains_queued_rows(fake_supabase, monkeypatch):
+    async def run():
+        queue = asyncio.Queue()
+        monkeypatch.setattr(stats, "_FLUSH_TARGETS", ((queue, "drained", None),))
+        queue.put_nowait({"session_id": "a"})
+        queue.put_nowait({"session_id": "b"})
+        await stats.stop_flushers()
+        return queue
+
+    queue = asyncio.run(run())
+    assert queue.empty()
+    assert len(fake_supabase.inserted["drained"]) == 2
+
+
+@pytest.mark.parametrize(
+    "field,value",
+    [("scroll_depth", 150), ("scroll_depth", -1), ("time_on_page", -5)],
+)
+def test_visit_rejects_out_of_range_metrics(field, value):
+    with pytest.raises(ValidationError):
+        stats.VisitData(page_url="/", session_id="s", **{field: value})
+
+
+def test_prepare_skips_rows_that_fail_to_parse(monkeypatch):
+    real_extract = stats.extract_device_info
+
+    def extract(user_agent):
+        if user_agent == "broken":
+            raise ValueError("unparseable user agent")
+        return real_extract(user_agent)
+
+    monkeypatch.setattr(stats, "extract_device_info", extract)
+    before = failed_rows("visits")
+
+    rows = stats._prepare_visit_rows(
+        [
+            {"user_agent": "broken", "page_url": "/", "client_ip": "1.1.1.1"},
+            {"user_agent": "Mozilla/5.0", "page_url": "/", "client_ip": "1.1.1.1"},
+            {"page_url": "/", "client_ip": "1.1.1.1"},  # missing user_agent
+        ]
+    )
+
+    assert len(rows) == 1
+    assert rows[0]["ip_hash"] == stats.hash_ip("1.1.1.1")
+    assert "client_ip" not in rows[0] and "is_bot" not in rows[0]
+    assert failed_rows("visits") == before + 2
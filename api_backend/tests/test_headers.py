@@ -0,0 +1,79 @@
+"""
+Tests for the raw-header helpers in routers.stats
+"""
+
+import asyncio
+
+from starlette.requests import Request
+
+from routers import stats
+
+
+def make_request(headers):
+    return Request(
+        {
+            "type": "http",
+            "headers": [(k.encode(), v.encode()) for k, v in headers],
+            "client": ("10.0.0.1", 1234),
+        }
+    )
+
+
+def test_helpers_share_one_scan():
+    request = make_request(
+        [
+            ("x-forwarded-for", "1.2.3.4, 5.6.7.8"),
+            ("cf-ipcountry", "DE"),
+            ("x-country-code", ""),
+            ("x-city", "Berlin"),
+        ]
+    )
+    found = stats._scan_headers(request)
+
+    assert stats.get_client_ip(request, found) == "1.2.3.4"
+    assert stats.get_location_from_headers(request, found) == {
+        "country": "DE",
+        "city": "Berlin",
+    }
+
+
+def test_client_ip_falls_back_to_peer():
+    request = make_request([("x-real-ip", "")])
+    assert stats.get_client_ip(request) == "10.0.0.1"
+
+
+def test_track_visit_scans_headers_once(monkeypatch):
+    calls = []
+    scan = stats._scan_headers
+    monkeypatch.setattr(stats, "_scan_headers", lambda r: calls.append(1) or scan(r))
+    monkeypatch.setattr(stats, "supabase_cli", object())
+    monkeypatch.setattr(stats, "visit_queue", asyncio.Queue())
+
+    request = make_request([("user-agent", "Mozilla/5.0"), ("cf-ipcountry", "US")])
+    visit = stats.VisitData(page_url="/blog", session_id="session-1")
+    result = asyncio.run(stats.track_visit(visit, request))
+
+    assert result["tracked"] is True
+    assert len(calls) == 1
+    assert stats.visit_queue.get_nowait()["country"] == "US"
+
+
+def test_engagement_ping_is_queued_as_event(monkeypatch):
+    monkeypatch.setattr(stats, "supabase_cli", object())
+    monkeypatch.setattr(stats, "visit_queue", asyncio.Queue())
+    monkeypatch.setattr(stats, "event_queue", asyncio.Queue())
+
+    request = make_request([("user-agent", "Mozilla/5.0")])
+    visit = stats.VisitData(
+        page_url="/blog", session_id="session-1", time_on_page=42, scroll_depth=80
+    )
+    result = asyncio.run(stats.track_visit(visit, request))
+
+    assert result["tracked"] is True
+    assert stats.visit_queue.empty()
+    assert stats.event_queue.get_nowait() == {
+        "session_id": "session-1",
+        "event_type": "page_engagement",
+        "event_data": {"time_on_page": 42, "scroll_depth": 80},
+        "page_url": "/blog",
+    }
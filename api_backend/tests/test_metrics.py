@@ -0,0 +1,37 @@
+"""
+Tests for access control on the /metrics endpoint
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", "sekrit")
+    return TestClient(main.app)
+
+
+def test_metrics_requires_token_from_external_clients(client):
+    assert client.get("/metrics").status_code == 403
+    assert (
+        client.get("/metrics", headers={"authorization": "Bearer nope"}).status_code
+        == 403
+    )
+
+
+def test_metrics_accepts_bearer_token(client):
+    response = client.get("/metrics", headers={"authorization": "Bearer sekrit"})
+    assert response.status_code == 200
+
+
+def test_metrics_rejects_non_ascii_authorization(client):
+    response = client.get("/metrics", headers={"authorization": b"Bearer \xc3\xa9"})
+    assert response.status_code == 403
+
+
+def test_metrics_allows_loopback_without_token():
+    client = TestClient(main.app, client=("127.0.0.1", 50000))
+    assert client.get("/metrics").status_code == 200
@@ -0,0 +1,64 @@
+"""
+Tests for request model validation in routers.stats
+"""
+
+import pytest
+import runpy
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from routers import stats
+
+GENERATOR = (
+    Path(__file__).resolve().parents[1] / "scripts" / "generate_allowed_pages.py"
+)
+
+
+@pytest.mark.parametrize(
+    "page_url,expected",
+    [
+        ("/", "/"),
+        ("/blog/", "/blog"),
+        ("/photography/demo-album-001/", "/photography/demo-album-001"),
+        ("/ml/demo-ml-001?utm=1#top", "/ml/demo-ml-001"),
+    ],
+)
+def test_page_url_is_normalized_to_a_path(page_url, expected):
+    visit = stats.VisitData(page_url=page_url, session_id="s")
+    assert visit.page_url == expected
+
+
+@pytest.mark.parametrize(
+    "page_url",
+    [
+        "https://EVIL.example/blog/x?q=1",
+        "//evil.example/blog",
+        "",
+        "   ",
+        "/wp-admin.php",
+        "/blog/a/b/c",
+        "/blog/not-a-real-post",
+    ],
+)
+def test_page_url_outside_the_site_is_rejected(page_url):
+    with pytest.raises(ValidationError):
+        stats.VisitData(page_url=page_url, session_id="s")
+
+
+def test_referrer_is_canonicalized():
+    visit = stats.VisitData(
+        page_url="/", session_id="s", referrer="https://www.Google.com/search?q=x"
+    )
+    assert visit.referrer == "https://www.google.com/search"
+    assert stats.VisitData(page_url="/", session_id="s", referrer="").referrer is None
+
+
+@pytest.mark.skipif(
+    not (GENERATOR.parents[2] / "astro_frontend").is_dir(),
+    reason="frontend sources not present",
+)
+def test_allowed_pages_match_site_content():
+    # Fails when content changes without re-running the generator
+    collect_pages = runpy.run_path(str(GENERATOR))["collect_pages"]
+    assert stats.ALLOWED_PAGES == frozenset(collect_pages())
@@ -0,0 +1,89 @@
+"""
+Tests for the cached /api/stats/summary computation
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from routers import stats
+
+
+class FakeRPC:
+    def __init__(self, client, days):
+        self.client = client
+        self.days = days
+
+    def execute(self):
+        self.client.calls.append(self.days)
+        if self.days in self.client.slow:
+            self.client.release.wait(timeout=5)
+        if self.client.fail:
+            raise RuntimeError("rpc failed")
+        return type("Result", (), {"data": {"total_visits": self.days}})()
+
+
+class FakeSupabase:
+    def __init__(self, slow=(), fail=False):
+        self.calls = []
+        self.slow = set(slow)
+        self.fail = fail
+        self.release = threading.Event()
+
+    def rpc(self, name, params):
+        return FakeRPC(self, params["days"])
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(monkeypatch):
+    monkeypatch.setattr(stats, "_summary_cache", {})
+    monkeypatch.setattr(stats, "_summary_inflight", {})
+
+
+def test_miss_for_one_key_does_not_block_another(monkeypatch):
+    client = FakeSupabase(slow={7})
+    monkeypatch.setattr(stats, "supabase_cli", client)
+
+    async def run():
+        slow = asyncio.create_task(stats._summary(7))
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        fast = await stats._summary(30)
+        elapsed = time.monotonic() - started
+        client.release.set()
+        return await slow, fast, elapsed
+
+    slow, fast, elapsed = asyncio.run(run())
+    assert slow["total_visits"] == 7
+    assert fast["total_visits"] == 30
+    assert elapsed < 1
+
+
+def test_concurrent_misses_share_one_call_and_its_error(monkeypatch):
+    client = FakeSupabase(slow={7}, fail=True)
+    monkeypatch.setattr(stats, "supabase_cli", client)
+
+    async def run():
+        waiters = [asyncio.create_task(stats._summary(7)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        client.release.set()
+        return await asyncio.gather(*waiters, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert client.calls == [7]
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert stats._summary_inflight == {}
+
+
+def test_cached_payload_is_reused(monkeypatch):
+    client = FakeSupabase()
+    monkeypatch.setattr(stats, "supabase_cli", client)
+
+    async def run():
+        await stats._summary(7)
+        return await stats._summary(7)
+
+    assert asyncio.run(run())["total_visits"] == 7
+    assert client.calls == [7]
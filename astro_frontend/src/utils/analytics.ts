@@ -143,7 +143,8 @@ export function setupPageEngagement(): void {
       ((scrollTop + windowHeight) / documentHeight) * 100
     );
 
-    maxScrollDepth = Math.max(maxScrollDepth, scrollPercentage);
+    // Overscroll can push this past 100; the API only accepts 0-100
+    maxScrollDepth = Math.min(100, Math.max(maxScrollDepth, scrollPercentage));
   };
 
   window.addEventListener('scroll', updateScrollDepth, { passive: true });
@@ -152,22 +153,26 @@ export function setupPageEngagement(): void {
   const sendEngagementData = () => {
     const timeOnPage = Math.round((Date.now() - startTime) / 1000); // seconds
 
+    // Engagement belongs to the visit already tracked on load, so send it
+    // as an event rather than another page view
+    const engagement = { time_on_page: timeOnPage, scroll_depth: maxScrollDepth };
+
     // Use sendBeacon for reliable delivery even when page is closing
     const data = {
       session_id: getOrCreateSessionId(),
+      event_type: 'page_engagement',
+      event_data: engagement,
       page_url: window.location.pathname,
-      time_on_page: timeOnPage,
-      scroll_depth: maxScrollDepth,
     };
 
     if (navigator.sendBeacon) {
       const blob = new Blob([JSON.stringify(data)], {
         type: 'application/json',
       });
-      navigator.sendBeacon(`${API_URL}/api/stats/track`, blob);
+      navigator.sendBeacon(`${API_URL}/api/stats/event`, blob);
     } else {
       // Fallback for browsers without sendBeacon
-      trackPageView({ time_on_page: timeOnPage, scroll_depth: maxScrollDepth });
+      trackEvent('page_engagement', engagement);
     }
   };
 